@@ -1,118 +1,231 @@
 import os
 import re
-from datetime import datetime, date
-from typing import Dict, List, Optional, Tuple, Set
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date
+from io import StringIO
+from typing import Dict, Iterator, List, Optional, Tuple, Set, TextIO, Union
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from person.models import (
     Person, Name, PersonName, ParentChildRelationship,
     BirthEvent, DeathEvent, MarriageEvent, DivorceEvent,
-    ImmigrationEvent, CitizenshipEvent, PersonAttachment
+    ImmigrationEvent, CitizenshipEvent
 )
-from person.management.util.person_matcher import PersonMatcher
+from person.management.util.person_matcher import MatchCandidate, PersonIndex, PersonMatcher
+
+
+# level, optional @xref@, tag, optional value
+_LINE_RE = re.compile(r'^(\d+)\s+(?:(@[^@]+@)\s+)?(\S+)(?:\s(.*))?$')
+_match_line = _LINE_RE.match
+# Level 1 tags that may repeat and hold pointers to other records
+_POINTER_TAGS = frozenset({'CHIL', 'HUSB', 'WIFE'})
+# Level 1 tags whose nested lines (DATE, PLAC, ...) are collected into a dict
+_EVENT_TAGS = frozenset({'BIRT', 'DEAT', 'MARR', 'DIV', 'EMIG', 'IMMI', 'NATU'})
+
+
+def _add_pointer(data: Dict, tag: str, value: str) -> None:
+    data.setdefault(tag, []).append(value)
+
+
+def _add_event(data: Dict, tag: str, value: str) -> Dict:
+    event = data[tag] = {}
+    return event
+
+
+def _add_value(data: Dict, tag: str, value: str) -> None:
+    data[tag] = value
+
+
+# Level 1 tag -> handler storing it on the record; returns the dict nested
+# lines go into, if any. Tags not listed are stored as plain values.
+_LEVEL1_HANDLERS = {
+    **dict.fromkeys(_POINTER_TAGS, _add_pointer),
+    **dict.fromkeys(_EVENT_TAGS, _add_event),
+}
+
+
+@dataclass(slots=True)
+class GEDCOMRecord:
+    """A level-0 INDI or FAM record; ``data`` maps level-1 tags to their values"""
+    id: Optional[str]
+    type: str
+    data: Dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class PendingFamily:
+    """Rows _import_family queued for one family, until _flush_relationships"""
+    id: Optional[str]
+    couple_events: List = field(default_factory=list)
+    relationships: List[ParentChildRelationship] = field(default_factory=list)
+    # Couples (both directions) whose marriages a queued divorce ends
+    divorced: Set[Tuple[int, int]] = field(default_factory=set)
+    # Already counted in stats; taken back out if the family can't be written
+    events_created: int = 0
+
+
+class PretendPerson:
+    """Stand-in for a Person that would be created in pretend mode.
+
+    Only used for logging; downstream code must check ``pretend`` before
+    touching anything model-specific.
+    """
+    __slots__ = ('id', 'label')
+
+    def __init__(self, id: str, label: str):
+        self.id = id
+        self.label = label
+
+    def __str__(self):
+        return f"<MockPerson: {self.label}>"
 
 
 class GEDCOMParser:
     """Parser for GEDCOM files"""
     
-    def __init__(self, file_path: str):
+    # Large reads keep the number of read() calls low on multi-hundred-MB files
+    READ_BUFFER_SIZE = 1 << 23
+    
+    def __init__(self, file_path: Union[str, TextIO]):
+        # A path, or an already open text file (e.g. a StringIO)
         self.file_path = file_path
         self.individuals = {}
         self.families = {}
         self.current_record = None
         self.current_level = 0
+        # Dict that nested lines at each level are stored in, so level 2/3
+        # lines don't have to search the record for their parent event
+        self.level_parent: List[Optional[Dict]] = [None] * 4
+        # (line number, problem) for lines that couldn't be parsed
+        self.errors: List[Tuple[int, str]] = []
+        self.record_types: Tuple[str, ...] = ('INDI', 'FAM')
+    
+    @classmethod
+    def from_string(cls, text: str) -> 'GEDCOMParser':
+        """Parser for GEDCOM text already in memory"""
+        return cls(StringIO(text))
         
     def parse(self) -> Tuple[Dict, Dict]:
         """Parse the GEDCOM file and return individuals and families"""
-        with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for record in self.iter_records():
+            if record.type == 'INDI':
+                self.individuals[record.id] = record
+            else:
+                self.families[record.id] = record
+        self.print_errors()
+        return self.individuals, self.families
+
+    def iter_records(self, record_types: Tuple[str, ...] = ('INDI', 'FAM')) -> Iterator[GEDCOMRecord]:
+        """Yield records of the given types one at a time as each is completed.
+        
+        Other records are tokenized but never built, so a pass over just the
+        INDI or just the FAM records holds one record in memory at a time.
+        """
+        self.record_types = record_types
+        self.current_record = None
+        self.level_parent = [None] * 4
+        self.errors = []
+        with self._open() as f:
+            # Bound once; this loop runs for every line of the file
+            parse_line = self._parse_line
             for line_num, line in enumerate(f, 1):
                 line = line.strip()
                 if not line:
                     continue
                     
                 try:
-                    self._parse_line(line, line_num)
+                    record = parse_line(line, line_num)
                 except Exception as e:
-                    print(f"Warning: Error parsing line {line_num}: {e}")
-                    
-        return self.individuals, self.families
+                    self.errors.append((line_num, str(e)))
+                    continue
+                if record is not None:
+                    yield record
+
+        if self.current_record is not None:
+            yield self.current_record
+            self.current_record = None
+    
+    def _open(self):
+        """Open the file for one pass over it"""
+        if hasattr(self.file_path, 'read'):
+            # Rewind so each pass starts at the top; the caller closes it
+            if self.file_path.seekable():
+                self.file_path.seek(0)
+            return nullcontext(self.file_path)
+        # Text mode keeps universal newlines, so CR-only files still split
+        # utf-8-sig drops a leading byte order mark, which would otherwise
+        # make the HEAD line unparseable
+        return open(self.file_path, 'r', encoding='utf-8-sig', errors='ignore',
+                    buffering=self.READ_BUFFER_SIZE)
+    
+    def error_summary(self) -> Optional[str]:
+        """One line describing the lines the last pass couldn't parse, if any"""
+        if not self.errors:
+            return None
+        line_num, problem = self.errors[0]
+        return f"Warning: {len(self.errors)} line(s) could not be parsed; first at line {line_num}: {problem}"
+    
+    def print_errors(self):
+        summary = self.error_summary()
+        if summary:
+            print(summary)
     
-    def _parse_line(self, line: str, line_num: int):
-        """Parse a single GEDCOM line"""
+    def _parse_line(self, line: str, line_num: int) -> Optional[GEDCOMRecord]:
+        """Parse a single GEDCOM line, returning the record it closes (if any)"""
         # GEDCOM format: level @id@ tag value
         # or: level tag value
-        parts = line.split(' ', 2)
-        if len(parts) < 2:
+        match = _match_line(line)
+        if not match:
+            self.errors.append((line_num, f"not a GEDCOM line: {line[:40]!r}"))
             return
-            
-        level = int(parts[0])
-        tag_or_id = parts[1]
-        value = parts[2] if len(parts) > 2 else ""
-        
-        # Check if this is an ID (starts and ends with @)
-        if tag_or_id.startswith('@') and tag_or_id.endswith('@'):
-            record_id = tag_or_id
-            tag = value
+        
+        level_str, record_id, tag, value = match.groups()
+        level = int(level_str)
+        if value is None:
             value = ""
-            if len(parts) > 2:
-                value = parts[2]
-        else:
-            record_id = None
-            tag = tag_or_id
+        record = self.current_record
+        parents = self.level_parent
             
         # Handle different record types
         if level == 0:
-            if tag == 'INDI':
-                self.current_record = {'id': record_id, 'type': 'INDI', 'data': {}}
-                self.individuals[record_id] = self.current_record
-            elif tag == 'FAM':
-                self.current_record = {'id': record_id, 'type': 'FAM', 'data': {}}
-                self.families[record_id] = self.current_record
+            # A new level 0 line ends the previous record
+            if tag in self.record_types:
+                self.current_record = GEDCOMRecord(record_id, tag)
             else:
                 self.current_record = None
-        elif self.current_record and level == 1:
-            # Handle multi-value fields like CHIL
-            if tag in ['CHIL', 'HUSB', 'WIFE']:
-                if tag not in self.current_record['data']:
-                    self.current_record['data'][tag] = []
-                self.current_record['data'][tag].append(value)
-            elif tag in ['BIRT', 'DEAT', 'MARR', 'DIV', 'EMIG', 'IMMI', 'NATU']:
-                self.current_record['data'][tag] = {}
-            else:
-                self.current_record['data'][tag] = value
-        elif self.current_record and level == 2:
+            parents[1] = parents[2] = None
+            return record
+        elif record is None:
+            # Lines inside HEAD, SOUR, NOTE and other records we don't import
+            return None
+        elif level == 2:
             # Handle nested data like BIRT DATE, BIRT PLAC, etc.
-            # Find the most recent level 1 tag that was a dict
-            parent_tag = None
-            for tag_name in list(self.current_record['data'].keys())[::-1]:
-                if isinstance(self.current_record['data'][tag_name], dict):
-                    parent_tag = tag_name
-                    break
-            
-            if parent_tag:
-                if tag not in self.current_record['data'][parent_tag]:
-                    self.current_record['data'][parent_tag][tag] = value
-        elif self.current_record and level == 3:
-            # Handle level 3 tags like PLAC_TO, PLAC_FROM
-            # Find the most recent level 1 tag that was a dict
-            parent_tag = None
-            for tag_name in list(self.current_record['data'].keys())[::-1]:
-                if isinstance(self.current_record['data'][tag_name], dict):
-                    parent_tag = tag_name
-                    break
-            
-            if parent_tag:
-                if tag not in self.current_record['data'][parent_tag]:
-                    self.current_record['data'][parent_tag][tag] = value
+            parent = parents[1]
+            if parent is not None:
+                parent.setdefault(tag, value)
+            parents[2] = parent
+        elif level == 1:
+            # Multi-value fields like CHIL, events like BIRT, or plain values
+            parents[1] = _LEVEL1_HANDLERS.get(tag, _add_value)(record.data, tag, value)
+        elif level == 3:
+            # Handle level 3 tags like PLAC_TO, PLAC_FROM; these are stored
+            # flat on the level 1 event alongside DATE and PLAC
+            parent = parents[2]
+            if parent is not None:
+                parent.setdefault(tag, value)
+        return None
 
 
 class GEDCOMImporter:
     """Import GEDCOM data into the database"""
     
-    def __init__(self, pretend: bool = True, strict: bool = True, stdout=None):
+    def __init__(self, pretend: bool = True, strict: bool = True, stdout=None, batch_size: int = 1000,
+                 verbose: bool = False):
         self.pretend = pretend
         self.strict = strict
+        self.verbose = verbose
+        self.batch_size = batch_size
         self.stats = {
             'individuals_created': 0,
             'individuals_updated': 0,
@@ -124,22 +237,74 @@ class GEDCOMImporter:
             'errors': []
         }
         self.stdout = stdout
+        # Output is written in blocks rather than flushed line by line
+        self._buf: List[str] = []
+        self._buf_bytes = 0
+        # Writes queued by _import_individual and sent in bulk by _flush
+        self._pending_people: List[Person] = []
+        self._pending_names: List[Tuple[Person, Tuple[str, str, str]]] = []
+        self._pending_events: List[Tuple] = []
+        self._pending_genders: Dict[int, Person] = {}
+        # (GEDCOM id, person) of each individual queued since the last flush
+        self._pending_individuals: List[Tuple[str, Person]] = []
+        # Candidates those individuals added to the PersonIndex
+        self._pending_candidates: List[MatchCandidate] = []
+        # (first, middle, last) -> Name id and (person id, name id) links,
+        # loaded once so names are resolved without a query per batch
+        self._known_names: Dict[Tuple[str, str, str], int] = {}
+        self._linked_names: Set[Tuple[int, int]] = set()
+        # Entries the current write attempt added to the two above, removed
+        # again if it is rolled back
+        self._new_names: List[Tuple[str, str, str]] = []
+        self._new_links: List[Tuple[int, int]] = []
+        # Existing couple events and parent-child links, loaded before the
+        # families pass: model -> ({(person, other, date)}, {(person, other)})
+        self._couple_events: Dict = {}
+        self._parent_child: Set[Tuple[int, int]] = set()
+        # Couple events and parent-child links queued by _import_family
+        self._pending_families: List[PendingFamily] = []
+        self._pending_rows = 0
+        # GEDCOM id -> name of each imported individual, for --verbose family output
+        self._labels: Dict[str, str] = {}
     def _write(self, msg):
+        self._buf.append(msg)
+        self._buf_bytes += len(msg)
+        if self._buf_bytes > 65536:
+            self._flush_buf()
+    def _debug(self, msg):
+        """Per-record detail, only shown with --verbose.
+        
+        Hot paths check self.verbose themselves so the message isn't even
+        formatted when it would be dropped.
+        """
+        if self.verbose:
+            self._write(msg)
+    def _error(self, msg):
+        self.stats['errors'].append(msg)
+        self._write(f"ERROR: {msg}")
+    def _flush_buf(self):
+        if not self._buf:
+            return
+        text = '\n'.join(self._buf)
+        self._buf = []
+        self._buf_bytes = 0
         if self.stdout:
-            self.stdout.write(msg + '\n')
+            self.stdout.write(text + '\n')
             self.stdout.flush()
         else:
-            print(msg, flush=True)
+            print(text, flush=True)
     def import_gedcom(self, file_path: str):
         """Import a GEDCOM file"""
         if not os.path.exists(file_path):
             raise CommandError(f"File not found: {file_path}")
         
+        try:
+            self._import_gedcom(file_path)
+        finally:
+            self._flush_buf()
+    def _import_gedcom(self, file_path: str):
         self._write(f"Parsing GEDCOM file: {file_path}")
         parser = GEDCOMParser(file_path)
-        individuals, families = parser.parse()
-        
-        self._write(f"Found {len(individuals)} individuals and {len(families)} families")
         
         if self.pretend:
             self._write("PRETEND MODE: No changes will be made to the database")
@@ -148,37 +313,75 @@ class GEDCOMImporter:
         
         # Import individuals first
         person_map = {}  # GEDCOM ID -> Django Person
-        existing_people = list(Person.objects.all())
-        
-        self._write(f"\nProcessing {len(individuals)} individuals...")
-        for gedcom_id, individual in individuals.items():
-            try:
-                person = self._import_individual(individual, existing_people)
-                if person:
-                    person_map[gedcom_id] = person
-                    # Add to existing_people for future duplicate detection
-                    if not self.pretend and person not in existing_people:
-                        existing_people.append(person)
-            except Exception as e:
-                error_msg = f"Error importing individual {gedcom_id}: {e}"
-                self.stats['errors'].append(error_msg)
-                self._write(f"ERROR: {error_msg}")
-        
-        # Import families and relationships
-        self._write(f"\nProcessing {len(families)} families...")
-        for family_id, family in families.items():
-            try:
-                self._import_family(family, person_map)
-            except Exception as e:
-                error_msg = f"Error importing family {family_id}: {e}"
-                self.stats['errors'].append(error_msg)
-                self._write(f"ERROR: {error_msg}")
+        # Candidates bucketed by surname and birth year, so each lookup only
+        # scans a few small buckets
+        person_index = PersonIndex.from_database()
+        if not self.pretend:
+            self._load_names()
+
+        # The file is read twice: individuals first, then families, which may
+        # reference individuals that appear later in the file. Each pass only
+        # holds the record being imported, so memory doesn't grow with the file.
+        individual_count = 0
+        family_count = 0
+
+        # Run the whole import in one transaction so writes are committed once.
+        # Individuals and families only queue their rows, which are written
+        # in bulk every batch_size records; _flush_relationships rolls back
+        # a failing family without aborting the rest.
+        with transaction.atomic():
+            if not self.pretend and connection.vendor == 'postgresql':
+                # Don't wait for the WAL flush on commit; a crash right after
+                # loses the import but can't corrupt the database
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL synchronous_commit = OFF')
+            self._write("\nProcessing individuals...")
+            for individual in parser.iter_records(('INDI',)):
+                individual_count += 1
+                gedcom_id = individual.id
+                try:
+                    person = self._import_individual(individual, person_index)
+                    if person:
+                        person_map[gedcom_id] = person
+                except Exception as e:
+                    self._error(f"Error importing individual {gedcom_id}: {e}")
+                
+                if individual_count % self.batch_size == 0:
+                    self._flush(person_index)
+            
+            # Families need primary keys for everyone they reference
+            self._flush(person_index)
+            if not self.pretend:
+                # People whose rows couldn't be written have no key
+                person_map = {gedcom_id: person.pk for gedcom_id, person in person_map.items() if person.pk}
+            parse_errors = parser.error_summary()
+            if parse_errors:
+                self._write(parse_errors)
+            self._write(f"Found {individual_count} individuals")
+
+            # Import families and relationships
+            self._write("\nProcessing families...")
+            if not self.pretend:
+                self._load_relationships()
+            for family in parser.iter_records(('FAM',)):
+                family_count += 1
+                family_id = family.id
+                try:
+                    # Only queues rows; they are written, and rolled back if
+                    # they fail, by _flush_relationships
+                    self._import_family(family, person_map)
+                except Exception as e:
+                    self._error(f"Error importing family {family_id}: {e}")
+                if self._pending_count() >= self.batch_size:
+                    self._flush_relationships()
+            self._flush_relationships()
+            self._write(f"Found {family_count} families")
         
         # Print summary
         self._print_summary()
-    def _import_individual(self, individual: Dict, existing_people: List[Person]) -> Optional[Person]:
-        gedcom_id = individual['id']
-        data = individual['data']
+    def _import_individual(self, individual: GEDCOMRecord, person_index: PersonIndex) -> Optional[Person]:
+        gedcom_id = individual.id
+        data = individual.data
         
         # Extract name
         name_info = data.get('NAME', '')
@@ -190,318 +393,356 @@ class GEDCOMImporter:
             self._write(f"Warning: Individual {gedcom_id} has no valid name")
             return None
         
-        self._write(f"Processing individual {gedcom_id}: {first_name} {middle_name} {last_name}")
+        if self.verbose:
+            self._write(f"Processing individual {gedcom_id}: {first_name} {middle_name} {last_name}")
+        
+        birth_data = data.get('BIRT')
+        birth_date = PersonMatcher._parse_date(birth_data.get('DATE', '')) if isinstance(birth_data, dict) else None
+        label = f"{first_name} {last_name}"
+        if self.verbose:
+            self._labels[gedcom_id] = label
         
-        # Check for existing person
-        existing_person = PersonMatcher.find_matching_person(data, existing_people, strict=self.strict)
-        if existing_person:
-            self._write(f"  Found existing person: {existing_person}")
-            person = existing_person
+        # Check for existing person; people queued earlier in this import are
+        # in the index too, so duplicates within the file are caught
+        match = person_index.find(first_name, middle_name, last_name, birth_date, strict=self.strict)
+        if match:
+            self._write(f"  Found existing person: {match.first_name} {match.last_name}")
+            person = match.person
             self.stats['individuals_updated'] += 1
         else:
             if self.pretend:
-                self._write(f"  Would create new person: {first_name} {last_name}")
-                # Create a mock person object with a fake ID for pretend mode
-                person = type('MockPerson', (), {'id': f"mock_{gedcom_id}", '__str__': lambda self: f"<MockPerson: {first_name} {last_name}>"})()
+                self._write(f"  Would create new person: {label}")
+                person = PretendPerson(f"mock_{gedcom_id}", label)
             else:
-                person = Person.objects.create()
-                self._write(f"  Created new person: {first_name} {last_name}")
+                person = Person()
+                self._pending_people.append(person)
+                self._write(f"  Created new person: {label}")
             self.stats['individuals_created'] += 1
+        if not self.pretend:
+            self._pending_individuals.append((gedcom_id, person))
         
         # Create or update name
         if self.pretend:
-            self._write(f"  Would check for existing name: {first_name} {middle_name} {last_name}")
-            self._write(f"  Would add name with type 'OTHER' if not already linked to person")
+            if self.verbose:
+                self._write(f"  Would check for existing name: {first_name} {middle_name} {last_name}")
+                self._write(f"  Would add name with type 'OTHER' if not already linked to person")
             self.stats['names_created'] += 1
             self.stats['names_linked'] += 1
         else:
-            # Check if this name already exists
-            name, name_created = Name.objects.get_or_create(
-                first_name=first_name,
-                middle_name=middle_name,
-                last_name=last_name
-            )
-            
-            if name_created:
-                self._write(f"  Created new name: {first_name} {middle_name} {last_name}")
-                self.stats['names_created'] += 1
-            else:
-                self._write(f"  Found existing name: {first_name} {middle_name} {last_name}")
-            
-            # Only link the name to the person if it's not already linked
-            person_name, relationship_created = PersonName.objects.get_or_create(
-                person=person,
-                name=name,
-                defaults={'name_type': PersonName.Type.OTHER}
-            )
-            
-            if relationship_created:
-                self._write(f"  Linked name to person with type 'OTHER'")
-                self.stats['names_linked'] += 1
-            else:
-                self._write(f"  Name already linked to person (skipping)")
+            # Resolved against existing names and linked when flushed
+            self._pending_names.append((person, (first_name, middle_name, last_name)))
+            if not match or (match.first_name, match.middle_name, match.last_name) != (first_name, middle_name, last_name):
+                candidate = MatchCandidate(
+                    person, first_name, middle_name, last_name,
+                    match.birth_date if match and match.birth_date else birth_date
+                )
+                person_index.add(candidate)
+                self._pending_candidates.append(candidate)
         
         # Import events
-        self._import_events(person, data)
+        self._import_events(person, data, label)
         # Import gender
         self._import_gender(person, data)
         return person
     
+    _GENDERS = {'M': Person.Gender.MALE, 'F': Person.Gender.FEMALE, 'U': Person.Gender.UNKNOWN}
+    
     def _import_gender(self, person: Person, data: Dict):
         """Import gender from GEDCOM SEX field"""
         sex = data.get('SEX', '')
         if sex:
-            gender_map = {'M': Person.Gender.MALE, 'F': Person.Gender.FEMALE, 'U': Person.Gender.UNKNOWN}
-            gender = gender_map.get(sex, Person.Gender.UNKNOWN)
+            gender = self._GENDERS.get(sex, Person.Gender.UNKNOWN)
             
             if self.pretend:
-                self._write(f"  Would set gender to: {gender} (from SEX: {sex})")
+                if self.verbose:
+                    self._write(f"  Would set gender to: {gender} (from SEX: {sex})")
             else:
+                # New people get it on insert; existing ones are bulk updated
+                if person.pk and person.gender != gender:
+                    self._pending_genders[person.pk] = person
                 person.gender = gender
-                person.save(update_fields=['gender'])
-                self._write(f"  Set gender to: {gender} (from SEX: {sex})")
+                if self.verbose:
+                    self._write(f"  Set gender to: {gender} (from SEX: {sex})")
     
-    def _import_events(self, person: Person, data: Dict):
-        """Import events for a person"""
-        # Birth event
-        if 'BIRT' in data:
-            birth_data = data['BIRT']
-            if not isinstance(birth_data, dict):
-                birth_data = {}
-            birth_date = PersonMatcher._parse_date(birth_data.get('DATE', ''))
-            birth_location = birth_data.get('PLAC', '')
-            if birth_date:
-                if self.pretend:
-                    self._write(f"  Would create BirthEvent: date={birth_date}, location='{birth_location}'")
-                    self.stats['events_created'] += 1
-                else:
-                    birth_event, created = BirthEvent.objects.get_or_create(
-                        person=person,
-                        defaults={
-                            'date': birth_date,
-                            'location': birth_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created BirthEvent: date={birth_date}, location='{birth_location}'")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  BirthEvent already exists for {person}")
-            elif birth_location:
-                if self.pretend:
-                    self._write(f"  Would create BirthEvent: location='{birth_location}' (no date)")
-                    self.stats['events_created'] += 1
-                else:
-                    birth_event, created = BirthEvent.objects.get_or_create(
-                        person=person,
-                        defaults={'location': birth_location}
-                    )
-                    if created:
-                        self._write(f"  Created BirthEvent: location='{birth_location}' (no date)")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  BirthEvent already exists for {person}")
-        
-        # Death event
-        if 'DEAT' in data:
-            death_data = data['DEAT']
-            if not isinstance(death_data, dict):
-                death_data = {}
-            death_date = PersonMatcher._parse_date(death_data.get('DATE', ''))
-            death_location = death_data.get('PLAC', '')
-            death_cause = death_data.get('CAUS', '')
-            if death_date:
-                if self.pretend:
-                    self._write(f"  Would create DeathEvent: date={death_date}, location='{death_location}', cause='{death_cause}'")
-                    self.stats['events_created'] += 1
-                else:
-                    death_event, created = DeathEvent.objects.get_or_create(
-                        person=person,
-                        defaults={
-                            'date': death_date,
-                            'location': death_location,
-                            'cause': death_cause
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created DeathEvent: date={death_date}, location='{death_location}', cause='{death_cause}'")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  DeathEvent already exists for {person}")
-            elif death_location or death_cause:
-                if self.pretend:
-                    self._write(f"  Would create DeathEvent: location='{death_location}', cause='{death_cause}' (no date)")
-                    self.stats['events_created'] += 1
-                else:
-                    death_event, created = DeathEvent.objects.get_or_create(
-                        person=person,
-                        defaults={
-                            'location': death_location,
-                            'cause': death_cause
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created DeathEvent: location='{death_location}', cause='{death_cause}' (no date)")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  DeathEvent already exists for {person}")
-        
-        # Immigration event
-        if 'IMMI' in data:
-            immi_data = data['IMMI']
-            if not isinstance(immi_data, dict):
-                immi_data = {}
-            immi_date = PersonMatcher._parse_date(immi_data.get('DATE', ''))
-            immi_location = immi_data.get('PLAC', '')
-            from_place = immi_data.get('PLAC_FROM', '')
-            to_place = immi_data.get('PLAC_TO', '')
-            if immi_date:
-                if self.pretend:
-                    self._write(f"  Would create ImmigrationEvent: date={immi_date}, from='{from_place}', to='{immi_location}', location='{immi_location}'")
-                    self.stats['events_created'] += 1
-                else:
-                    # For IMMI, the PLAC is the destination, PLAC_FROM is the origin
-                    immi_event, created = ImmigrationEvent.objects.get_or_create(
-                        person=person,
-                        date=immi_date,
-                        defaults={
-                            'from_country': from_place,
-                            'to_country': immi_location,  # Use PLAC as destination
-                            'location': immi_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created ImmigrationEvent: date={immi_date}, from='{from_place}', to='{immi_location}', location='{immi_location}'")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  ImmigrationEvent already exists for {person}")
-            elif immi_location or from_place:
-                if self.pretend:
-                    self._write(f"  Would create ImmigrationEvent: from='{from_place}', to='{immi_location}', location='{immi_location}' (no date)")
-                    self.stats['events_created'] += 1
-                else:
-                    immi_event, created = ImmigrationEvent.objects.get_or_create(
-                        person=person,
-                        defaults={
-                            'from_country': from_place,
-                            'to_country': immi_location,
-                            'location': immi_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created ImmigrationEvent: from='{from_place}', to='{immi_location}', location='{immi_location}' (no date)")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  ImmigrationEvent already exists for {person}")
-        
-        # Emigration event (also immigration-related)
-        if 'EMIG' in data:
-            emig_data = data['EMIG']
-            if not isinstance(emig_data, dict):
-                emig_data = {}
-            emig_date = PersonMatcher._parse_date(emig_data.get('DATE', ''))
-            emig_location = emig_data.get('PLAC', '')
-            to_place = emig_data.get('PLAC_TO', '')
-            if emig_date:
-                if self.pretend:
-                    self._write(f"  Would create ImmigrationEvent (emigration): date={emig_date}, from='{emig_location}', to='{to_place}', location='{emig_location}'")
-                    self.stats['events_created'] += 1
-                else:
-                    emig_event, created = ImmigrationEvent.objects.get_or_create(
-                        person=person,
-                        date=emig_date,
-                        defaults={
-                            'from_country': emig_location,
-                            'to_country': to_place,
-                            'location': emig_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created ImmigrationEvent (emigration): date={emig_date}, from='{emig_location}', to='{to_place}', location='{emig_location}'")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  ImmigrationEvent (emigration) already exists for {person}")
-            elif emig_location or to_place:
-                if self.pretend:
-                    self._write(f"  Would create ImmigrationEvent (emigration): from='{emig_location}', to='{to_place}', location='{emig_location}' (no date)")
-                    self.stats['events_created'] += 1
-                else:
-                    emig_event, created = ImmigrationEvent.objects.get_or_create(
-                        person=person,
-                        defaults={
-                            'from_country': emig_location,
-                            'to_country': to_place,
-                            'location': emig_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created ImmigrationEvent (emigration): from='{emig_location}', to='{to_place}', location='{emig_location}' (no date)")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  ImmigrationEvent (emigration) already exists for {person}")
-        
-        # Citizenship event
-        if 'NATU' in data:
-            natu_data = data['NATU']
-            if not isinstance(natu_data, dict):
-                natu_data = {}
-            natu_date = PersonMatcher._parse_date(natu_data.get('DATE', ''))
-            natu_location = natu_data.get('PLAC', '')
-            if natu_date:
-                if self.pretend:
-                    self._write(f"  Would create CitizenshipEvent: date={natu_date}, country='{natu_location}', location='{natu_location}'")
-                    self.stats['events_created'] += 1
-                else:
-                    natu_event, created = CitizenshipEvent.objects.get_or_create(
-                        person=person,
-                        date=natu_date,
-                        defaults={
-                            'country': natu_location,
-                            'location': natu_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created CitizenshipEvent: date={natu_date}, country='{natu_location}', location='{natu_location}'")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  CitizenshipEvent already exists for {person}")
-            elif natu_location:
-                if self.pretend:
-                    self._write(f"  Would create CitizenshipEvent: country='{natu_location}', location='{natu_location}' (no date)")
-                    self.stats['events_created'] += 1
+    def _queue_event(self, model, person: Person, label: str, event_name: str,
+                     fields: Dict, match_date: bool = False):
+        """Queue an event for _flush, which skips it if the person already has one.
+        
+        Mirrors get_or_create: with match_date an event on the same date
+        counts as existing, otherwise any event of that type does.
+        """
+        self._pending_events.append((model, person, label, event_name, match_date, fields))
+    
+    def _flush(self, person_index: PersonIndex):
+        """Write queued people, names and events with one bulk query per table.
+        
+        The batch is written in a savepoint. If that fails, it is retried one
+        person at a time, so only the individuals that can't be written are
+        dropped and reported, and taken out of person_index so later records
+        can't match them.
+        """
+        people, names, events, genders = (
+            self._pending_people, self._pending_names, self._pending_events, self._pending_genders
+        )
+        individuals, candidates = self._pending_individuals, self._pending_candidates
+        self._pending_people, self._pending_names, self._pending_events = [], [], []
+        self._pending_genders = {}
+        self._pending_individuals, self._pending_candidates = [], []
+        if not (people or names or events or genders):
+            return
+        if self._try_write(people, names, events, genders) is None:
+            return
+        
+        # The same person can be queued by several records matched to them
+        new_people = {id(person) for person in people}
+        units = {}
+        for gedcom_id, person in individuals:
+            unit = units.setdefault(id(person), (person, [], [], [], []))
+            unit[1].append(gedcom_id)
+        for entry in names:
+            units[id(entry[0])][2].append(entry)
+        for entry in events:
+            units[id(entry[1])][3].append(entry)
+        for candidate in candidates:
+            units[id(candidate.person)][4].append(candidate)
+        
+        for person, gedcom_ids, person_names, person_events, person_candidates in units.values():
+            is_new = id(person) in new_people
+            error = self._try_write(
+                [person] if is_new else [], person_names, person_events,
+                {person.pk: person} if person.pk in genders else {}
+            )
+            if error is None:
+                continue
+            self.stats['individuals_created'] -= is_new
+            self.stats['individuals_updated'] -= len(gedcom_ids) - is_new
+            # A new person has no row to link to, and an existing one didn't
+            # get these names
+            for candidate in person_candidates:
+                person_index.remove(candidate)
+            for gedcom_id in gedcom_ids:
+                self._error(f"Error importing individual {gedcom_id}: {error}")
+    
+    def _try_write(self, people: List[Person], names: List, events: List,
+                   genders: Dict[int, Person]) -> Optional[Exception]:
+        """Write rows in a savepoint, returning the error if they were rolled back.
+        
+        A failed attempt also leaves no trace in memory: new people lose the
+        keys they were given, and names, links and counts are restored.
+        """
+        counts = {key: value for key, value in self.stats.items() if key != 'errors'}
+        self._new_names, self._new_links = [], []
+        try:
+            with transaction.atomic():
+                if people:
+                    self._insert_with_keys(Person, people)
+                if names:
+                    self._flush_names(names)
+                if events:
+                    self._flush_events(events)
+                if genders:
+                    # Skips Person.save(), whose only extra step keeps
+                    # is_living in sync with a death; _flush_events does that
+                    # for the deaths it writes, and gender doesn't affect it
+                    Person.objects.bulk_update(genders.values(), ['gender'], batch_size=self.batch_size)
+        except Exception as e:
+            self.stats.update(counts)
+            for person in people:
+                person.pk = None
+            for key in self._new_names:
+                del self._known_names[key]
+            self._linked_names.difference_update(self._new_links)
+            return e
+        return None
+    
+    def _insert(self, model, objs: List):
+        """Insert rows whose primary keys aren't needed afterwards.
+        
+        On PostgreSQL with psycopg 3 the rows are streamed with COPY, which
+        skips per-row parameter binding; elsewhere this is bulk_create.
+        """
+        if not objs:
+            return
+        if connection.vendor == 'postgresql':
+            from django.db.backends.postgresql.psycopg_any import is_psycopg3
+            if is_psycopg3:
+                self._copy_rows(model, objs)
+                return
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+    
+    def _copy_rows(self, model, objs: List):
+        fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+        quote = connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            quote(model._meta.db_table), ', '.join(quote(f.column) for f in fields)
+        )
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for obj in objs:
+                    copy.write_row([f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields])
+    
+    def _insert_with_keys(self, model, objs: List):
+        """Insert rows whose primary keys are needed afterwards"""
+        if connection.features.can_return_rows_from_bulk_insert:
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+        else:
+            # Backends that can't return keys from a bulk insert
+            for obj in objs:
+                obj.save()
+    
+    def _load_names(self):
+        """Read every existing name and name link into memory"""
+        for name_id, first_name, middle_name, last_name in Name.objects.order_by('pk').values_list(
+            'id', 'first_name', 'middle_name', 'last_name'
+        ).iterator(chunk_size=5000):
+            self._known_names.setdefault((first_name, middle_name, last_name), name_id)
+        self._linked_names = set(PersonName.objects.values_list('person_id', 'name_id').iterator(chunk_size=5000))
+    
+    def _flush_names(self, pending: List[Tuple[Person, Tuple[str, str, str]]]):
+        """Reuse or create each queued name, then link it to its person"""
+        known = self._known_names
+        new_names = {}
+        for _, key in pending:
+            if key not in known and key not in new_names:
+                new_names[key] = Name(first_name=key[0], middle_name=key[1], last_name=key[2])
+        self._insert_with_keys(Name, list(new_names.values()))
+        for key, name in new_names.items():
+            known[key] = name.pk
+            self._new_names.append(key)
+            if self.verbose:
+                self._write(f"  Created new name: {key[0]} {key[1]} {key[2]}")
+        self.stats['names_created'] += len(new_names)
+        
+        linked = self._linked_names
+        links = []
+        for person, key in pending:
+            name_id = known[key]
+            if (person.pk, name_id) in linked:
+                if self.verbose:
+                    self._write(f"  Name already linked to {key[0]} {key[2]} (skipping)")
+                continue
+            linked.add((person.pk, name_id))
+            self._new_links.append((person.pk, name_id))
+            links.append(PersonName(person=person, name_id=name_id, name_type=PersonName.Type.OTHER))
+            if self.verbose:
+                self._write(f"  Linked name {key[0]} {key[2]} to person with type 'OTHER'")
+        self._insert(PersonName, links)
+        self.stats['names_linked'] += len(links)
+    
+    def _flush_events(self, pending: List[Tuple]):
+        """Create queued events that don't already exist"""
+        by_model = {}
+        for entry in pending:
+            by_model.setdefault(entry[0], []).append(entry)
+        
+        dead = []
+        for model, entries in by_model.items():
+            existing = set(model.objects.filter(
+                person_id__in={entry[1].pk for entry in entries}
+            ).values_list('person_id', 'date'))
+            has_event = {person_id for person_id, _ in existing}
+            
+            events = []
+            for _, person, label, event_name, match_date, fields in entries:
+                if match_date:
+                    found = (person.pk, fields.get('date')) in existing
                 else:
-                    natu_event, created = CitizenshipEvent.objects.get_or_create(
-                        person=person,
-                        defaults={
-                            'country': natu_location,
-                            'location': natu_location
-                        }
-                    )
-                    if created:
-                        self._write(f"  Created CitizenshipEvent: country='{natu_location}', location='{natu_location}' (no date)")
-                        self.stats['events_created'] += 1
-                    else:
-                        self._write(f"  CitizenshipEvent already exists for {person}")
-    def _import_family(self, family: Dict, person_map: Dict):
+                    found = person.pk in has_event
+                if found:
+                    if self.verbose:
+                        self._write(f"  {event_name} already exists for {label}")
+                    continue
+                existing.add((person.pk, fields.get('date')))
+                has_event.add(person.pk)
+                events.append(model(person=person, **fields))
+                if self.verbose:
+                    self._write(f"  Created {self._describe_event(event_name, fields)}")
+            self._insert(model, events)
+            self.stats['events_created'] += len(events)
+            
+            if model is DeathEvent:
+                dead.extend(event.person for event in events)
+        
+        # bulk_create skips DeathEvent.save(), which marks the person deceased
+        if dead:
+            Person.objects.filter(pk__in={person.pk for person in dead}).update(is_living=False)
+            for person in dead:
+                person.is_living = False
+    
+    # GEDCOM tag, model, name for output, model field -> GEDCOM subtag, and
+    # whether a dated event only matches an existing one on the same date
+    # (births and deaths are one per person)
+    _EVENT_SPECS = (
+        ('BIRT', BirthEvent, 'BirthEvent', {'location': 'PLAC'}, False),
+        ('DEAT', DeathEvent, 'DeathEvent', {'location': 'PLAC', 'cause': 'CAUS'}, False),
+        # For IMMI, the PLAC is the destination, PLAC_FROM is the origin
+        ('IMMI', ImmigrationEvent, 'ImmigrationEvent',
+         {'from_country': 'PLAC_FROM', 'to_country': 'PLAC', 'location': 'PLAC'}, True),
+        ('EMIG', ImmigrationEvent, 'ImmigrationEvent (emigration)',
+         {'from_country': 'PLAC', 'to_country': 'PLAC_TO', 'location': 'PLAC'}, True),
+        ('NATU', CitizenshipEvent, 'CitizenshipEvent', {'country': 'PLAC', 'location': 'PLAC'}, True),
+    )
+    
+    def _import_events(self, person: Person, data: Dict, label: str = ''):
+        """Import events for a person"""
+        for tag, model, event_name, field_tags, match_date in self._EVENT_SPECS:
+            if tag not in data:
+                continue
+            event_data = data[tag]
+            if not isinstance(event_data, dict):
+                event_data = {}
+            
+            event_date = PersonMatcher._parse_date(event_data.get('DATE', ''))
+            fields = {'date': event_date} if event_date else {}
+            for field_name, subtag in field_tags.items():
+                fields[field_name] = event_data.get(subtag, '')
+            # Undated events are only worth keeping if they say something
+            if not event_date and not any(fields.values()):
+                continue
+            
+            if self.pretend:
+                # Only counted; the description is built just for verbose runs
+                if self.verbose:
+                    self._write(f"  Would create {self._describe_event(event_name, fields)}")
+                self.stats['events_created'] += 1
+            else:
+                self._queue_event(model, person, label, event_name, fields,
+                                  match_date=match_date and event_date is not None)
+    
+    @staticmethod
+    def _describe_event(event_name: str, fields: Dict) -> str:
+        details = ', '.join(
+            f"{key}={value}" if key == 'date' else f"{key}='{value}'" for key, value in fields.items()
+        )
+        return f"{event_name}: {details}" + ('' if 'date' in fields else ' (no date)')
+    
+    def _import_family(self, family: GEDCOMRecord, person_map: Dict):
         """Import a family and its relationships"""
-        data = family['data']
-        family_id = family['id']
+        data = family.data
+        family_id = family.id
         
-        # Get family members
-        husband_id = data.get('HUSB', [''])[0] if isinstance(data.get('HUSB'), list) else data.get('HUSB', '')
-        wife_id = data.get('WIFE', [''])[0] if isinstance(data.get('WIFE'), list) else data.get('WIFE', '')
-        children_ids = data.get('CHIL', []) if isinstance(data.get('CHIL'), list) else [data.get('CHIL')] if data.get('CHIL') else []
+        # Get family members, one person_map lookup each
+        husband_id = next(iter(self._pointers(data, 'HUSB')), '')
+        wife_id = next(iter(self._pointers(data, 'WIFE')), '')
+        children_ids = self._pointers(data, 'CHIL')
         
         husband = person_map.get(husband_id)
         wife = person_map.get(wife_id)
         
-        self._write(f"Processing family {family_id}:")
-        self._write(f"  Husband: {husband_id} -> {husband}")
-        self._write(f"  Wife: {wife_id} -> {wife}")
-        self._write(f"  Children: {children_ids}")
+        # Shown as names; in real runs person_map holds primary keys
+        husband_label = self._label(husband_id, husband)
+        wife_label = self._label(wife_id, wife)
+        couple = f"{husband_label} + {wife_label}"
+        
+        if self.verbose:
+            self._write(f"Processing family {family_id}:")
+            self._write(f"  Husband: {husband_id} -> {husband_label}")
+            self._write(f"  Wife: {wife_id} -> {wife_label}")
+            self._write(f"  Children: {children_ids}")
         
         # Create marriage event if both spouses exist
         if husband and wife:
+            pending = PendingFamily(family_id)
             marriage_data = data.get('MARR', {})
             if not isinstance(marriage_data, dict):
                 marriage_data = {}
@@ -510,37 +751,25 @@ class GEDCOMImporter:
             
             if marriage_date:
                 if self.pretend:
-                    self._write(f"  Would create MarriageEvent: {husband} + {wife}, date={marriage_date}, location='{marriage_location}'")
+                    self._debug(f"  Would create MarriageEvent: {couple}, date={marriage_date}, location='{marriage_location}'")
                     self.stats['events_created'] += 1
                 else:
                     # Only create one marriage event per couple per date
-                    if not MarriageEvent.objects.filter(
-                        person=husband, other_person=wife, date=marriage_date
-                    ).exists() and not MarriageEvent.objects.filter(
-                        person=wife, other_person=husband, date=marriage_date
-                    ).exists():
-                        MarriageEvent.objects.create(
-                            person=husband,
-                            other_person=wife,
-                            date=marriage_date,
-                            location=marriage_location
-                        )
-                        self._write(f"  Created MarriageEvent: {husband} + {wife}, date={marriage_date}, location='{marriage_location}'")
+                    if self._create_couple_event(pending, MarriageEvent, husband, wife, marriage_date, marriage_location):
+                        self._debug(f"  Created MarriageEvent: {couple}, date={marriage_date}, location='{marriage_location}'")
                         self.stats['events_created'] += 1
                     else:
-                        self._write(f"  MarriageEvent already exists for {husband} + {wife} on {marriage_date}")
+                        self._debug(f"  MarriageEvent already exists for {couple} on {marriage_date}")
             elif marriage_location:
                 if self.pretend:
-                    self._write(f"  Would create MarriageEvent: {husband} + {wife}, location='{marriage_location}' (no date)")
+                    self._debug(f"  Would create MarriageEvent: {couple}, location='{marriage_location}' (no date)")
                     self.stats['events_created'] += 1
                 else:
-                    MarriageEvent.objects.get_or_create(
-                        person=husband,
-                        other_person=wife,
-                        defaults={'location': marriage_location}
-                    )
-                    self._write(f"  Created MarriageEvent: {husband} + {wife}, location='{marriage_location}' (no date)")
-                    self.stats['events_created'] += 1
+                    if self._create_couple_event(pending, MarriageEvent, husband, wife, None, marriage_location):
+                        self._debug(f"  Created MarriageEvent: {couple}, location='{marriage_location}' (no date)")
+                        self.stats['events_created'] += 1
+                    else:
+                        self._debug(f"  MarriageEvent already exists for {couple}")
             
             # Create divorce event if present
             divorce_data = data.get('DIV', {})
@@ -551,75 +780,64 @@ class GEDCOMImporter:
             
             if divorce_date:
                 if self.pretend:
-                    self._write(f"  Would create DivorceEvent: {husband} + {wife}, date={divorce_date}, location='{divorce_location}'")
+                    self._debug(f"  Would create DivorceEvent: {couple}, date={divorce_date}, location='{divorce_location}'")
                     self.stats['events_created'] += 1
                 else:
                     # Only create one divorce event per couple per date
-                    if not DivorceEvent.objects.filter(
-                        person=husband, other_person=wife, date=divorce_date
-                    ).exists() and not DivorceEvent.objects.filter(
-                        person=wife, other_person=husband, date=divorce_date
-                    ).exists():
-                        DivorceEvent.objects.create(
-                            person=husband,
-                            other_person=wife,
-                            date=divorce_date,
-                            location=divorce_location
-                        )
-                        self._write(f"  Created DivorceEvent: {husband} + {wife}, date={divorce_date}, location='{divorce_location}'")
+                    if self._create_couple_event(pending, DivorceEvent, husband, wife, divorce_date, divorce_location):
+                        self._debug(f"  Created DivorceEvent: {couple}, date={divorce_date}, location='{divorce_location}'")
                         self.stats['events_created'] += 1
                     else:
-                        self._write(f"  DivorceEvent already exists for {husband} + {wife} on {divorce_date}")
+                        self._debug(f"  DivorceEvent already exists for {couple} on {divorce_date}")
             elif divorce_location:
                 if self.pretend:
-                    self._write(f"  Would create DivorceEvent: {husband} + {wife}, location='{divorce_location}' (no date)")
+                    self._debug(f"  Would create DivorceEvent: {couple}, location='{divorce_location}' (no date)")
                     self.stats['events_created'] += 1
                 else:
-                    DivorceEvent.objects.get_or_create(
-                        person=husband,
-                        other_person=wife,
-                        defaults={'location': divorce_location}
-                    )
-                    self._write(f"  Created DivorceEvent: {husband} + {wife}, location='{divorce_location}' (no date)")
-                    self.stats['events_created'] += 1
+                    if self._create_couple_event(pending, DivorceEvent, husband, wife, None, divorce_location):
+                        self._debug(f"  Created DivorceEvent: {couple}, location='{divorce_location}' (no date)")
+                        self.stats['events_created'] += 1
+                    else:
+                        self._debug(f"  DivorceEvent already exists for {couple}")
             
             # Create parent-child relationships
+            children = []
             for child_id in children_ids:
                 if child_id:  # Skip empty child IDs
                     child = person_map.get(child_id)
                     if child:
-                        if self.pretend:
-                            if husband:
-                                self._write(f"  Would create parent-child relationship: {husband} -> {child}")
-                            if wife:
-                                self._write(f"  Would create parent-child relationship: {wife} -> {child}")
-                            self.stats['relationships_created'] += 1
-                        else:
-                            # Create parent-child relationships
-                            if husband:
-                                relationship, created = ParentChildRelationship.objects.get_or_create(
-                                    parent=husband,
-                                    child=child
-                                )
-                                if created:
-                                    self._write(f"  Created parent-child relationship: {husband} -> {child}")
-                                    self.stats['relationships_created'] += 1
-                                else:
-                                    self._write(f"  Parent-child relationship already exists: {husband} -> {child}")
-                            if wife:
-                                relationship, created = ParentChildRelationship.objects.get_or_create(
-                                    parent=wife,
-                                    child=child
-                                )
-                                if created:
-                                    self._write(f"  Created parent-child relationship: {wife} -> {child}")
-                                    self.stats['relationships_created'] += 1
-                                else:
-                                    self._write(f"  Parent-child relationship already exists: {wife} -> {child}")
+                        children.append((child_id, child))
                     else:
                         self._write(f"  Warning: Child {child_id} not found in person map")
                 else:
                     self._write(f"  Warning: Empty child ID in family {family_id}")
+            
+            if self.pretend:
+                if self.verbose:
+                    for child_id, child in children:
+                        child_label = self._label(child_id, child)
+                        self._write(f"  Would create parent-child relationship: {husband_label} -> {child_label}")
+                        self._write(f"  Would create parent-child relationship: {wife_label} -> {child_label}")
+                self.stats['relationships_created'] += len(children)
+            elif children:
+                # Queued and inserted in batches by _flush_relationships
+                existing = self._parent_child
+                for child_id, child in children:
+                    for parent, parent_label in ((husband, husband_label), (wife, wife_label)):
+                        if (parent, child) in existing:
+                            if self.verbose:
+                                self._write(f"  Parent-child relationship already exists: "
+                                            f"{parent_label} -> {self._label(child_id, child)}")
+                            continue
+                        existing.add((parent, child))
+                        pending.relationships.append(ParentChildRelationship(parent_id=parent, child_id=child))
+                        self.stats['relationships_created'] += 1
+                        if self.verbose:
+                            self._write(f"  Created parent-child relationship: {parent_label} -> {self._label(child_id, child)}")
+            
+            if not self.pretend and (pending.couple_events or pending.relationships):
+                self._pending_families.append(pending)
+                self._pending_rows += len(pending.couple_events) + len(pending.relationships)
         else:
             if not husband and not wife:
                 self._write(f"  Warning: No spouses found for family {family_id}")
@@ -627,6 +845,147 @@ class GEDCOMImporter:
                 self._write(f"  Warning: Husband {husband_id} not found for family {family_id}")
             elif not wife:
                 self._write(f"  Warning: Wife {wife_id} not found for family {family_id}")
+    
+    def _label(self, gedcom_id: str, person) -> str:
+        """How a family member is named in the output"""
+        if person is None or self.pretend:
+            return str(person)
+        return self._labels.get(gedcom_id, gedcom_id)
+    @staticmethod
+    def _pointers(data: Dict, tag: str) -> List[str]:
+        """The pointers stored under tag; the parser keeps them as a list"""
+        value = data.get(tag)
+        if isinstance(value, list):
+            return value
+        return [value] if value else []
+    
+    def _pending_count(self) -> int:
+        return self._pending_rows
+    
+    def _flush_relationships(self):
+        """Write the couple events and parent-child links queued by _import_family.
+        
+        The batch is written in a savepoint. If that fails, each family is
+        retried in its own, so only the families that can't be written are
+        dropped and reported, and their rows can be queued again by a later
+        family.
+        """
+        families, self._pending_families = self._pending_families, []
+        self._pending_rows = 0
+        if not families:
+            return
+        try:
+            with transaction.atomic():
+                self._write_families(families)
+        except Exception:
+            for family in families:
+                try:
+                    with transaction.atomic():
+                        self._write_families([family])
+                except Exception as e:
+                    self.stats['events_created'] -= family.events_created
+                    self.stats['relationships_created'] -= len(family.relationships)
+                    self._forget_family(family)
+                    self._error(f"Error importing family {family.id}: {e}")
+    
+    def _forget_family(self, family: PendingFamily):
+        """Drop the keys a family that couldn't be written added in _import_family"""
+        self._parent_child.difference_update((rel.parent_id, rel.child_id) for rel in family.relationships)
+        for model in (MarriageEvent, DivorceEvent):
+            events, couples = self._couple_events[model]
+            dropped = {
+                (event.person_id, event.other_person_id, event.date)
+                for event in family.couple_events if type(event) is model
+            }
+            if not dropped:
+                continue
+            events -= dropped
+            # A couple stays known while any other event of theirs is left
+            remaining = {(person, other) for person, other, _ in events}
+            couples.difference_update((person, other) for person, other, _ in dropped
+                                      if (person, other) not in remaining)
+    
+    def _write_families(self, families: List[PendingFamily]):
+        couple_events = {MarriageEvent: [], DivorceEvent: []}
+        relationships = []
+        # Like DivorceEvent.save(), a divorce only ends the marriages that
+        # exist when it is written: those queued before it, walking back
+        # from the last family, and those already in the database
+        divorced = set()
+        for family in reversed(families):
+            divorced |= family.divorced
+            for event in family.couple_events:
+                if type(event) is MarriageEvent:
+                    event.ended = (event.person_id, event.other_person_id) in divorced
+        for family in families:
+            for event in family.couple_events:
+                couple_events[type(event)].append(event)
+            relationships += family.relationships
+        # Keys set by an attempt that was rolled back must not be reused
+        for obj in (*couple_events[MarriageEvent], *couple_events[DivorceEvent], *relationships):
+            obj.pk = None
+        
+        if divorced:
+            # Runs before this batch's marriages are inserted, so only
+            # earlier ones are ended here
+            people = {person for couple in divorced for person in couple}
+            ended = [
+                pk for pk, person, other in MarriageEvent.objects.filter(
+                    ended=False, person_id__in=people
+                ).values_list('pk', 'person_id', 'other_person_id')
+                if (person, other) in divorced
+            ]
+            MarriageEvent.objects.filter(pk__in=ended).update(ended=True)
+        for model, rows in couple_events.items():
+            self._insert(model, rows)
+        # Inserting skips save(), whose m2m sync only re-adds this same row.
+        # Rows go in (parent, child) order so the unique index is filled
+        # sequentially rather than at random pages.
+        relationships.sort(key=lambda rel: (rel.parent_id, rel.child_id))
+        self._insert(ParentChildRelationship, relationships)
+    
+    def _create_couple_event(self, pending: PendingFamily, model, husband: int, wife: int,
+                             event_date: Optional[date], location: str) -> bool:
+        """Queue a couple event in both directions unless one already exists.
+        
+        Queues the rows CoupleEvent.save() would write (and for divorces, the
+        couple whose marriages end like DivorceEvent.save()) on the family's
+        pending rows.
+        An undated event matches any existing event for the couple.
+        """
+        events, couples = self._couple_events[model]
+        if event_date:
+            found = (husband, wife, event_date) in events or (wife, husband, event_date) in events
+        else:
+            found = (husband, wife) in couples or (wife, husband) in couples
+        if found:
+            return False
+        
+        for person, other in ((husband, wife), (wife, husband)):
+            # Someone listed as both spouses has no separate mirrored row
+            if (person, other, event_date) in events:
+                continue
+            pending.couple_events.append(
+                model(person_id=person, other_person_id=other, date=event_date, location=location)
+            )
+            events.add((person, other, event_date))
+            couples.add((person, other))
+        if model is DivorceEvent:
+            pending.divorced.update(((husband, wife), (wife, husband)))
+        pending.events_created += 1
+        return True
+    
+    def _load_relationships(self):
+        """Read every couple event and parent-child link into memory"""
+        for model in (MarriageEvent, DivorceEvent):
+            events = set(model.objects.values_list(
+                'person_id', 'other_person_id', 'date'
+            ).iterator(chunk_size=5000))
+            self._couple_events[model] = (events, {(person, other) for person, other, _ in events})
+        self._parent_child = set(ParentChildRelationship.objects.values_list(
+            'parent_id', 'child_id'
+        ).iterator(chunk_size=5000))
+    
     def _print_summary(self):
         self._write("\n" + "="*50)
         self._write("IMPORT SUMMARY")
@@ -675,19 +1034,29 @@ class Command(BaseCommand):
         parser.add_argument(
             '--verbose',
             action='store_true',
-            help='Verbose output'
+            help='Show every name, event and relationship as it is processed'
         )
         parser.add_argument(
             '--strict',
             action='store_true',
             help='Use strict matching (no nicknames)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of records to queue before writing them in bulk (default 1000); '
+                 'a batch that fails is retried one record at a time'
+        )
     
     def handle(self, *args, **options):
         file_path = options['file_path']
         pretend = not options['no_pretend']
         verbose = options['verbose']
         strict = options['strict']  # Default to non-strict
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
         
         if verbose:
             print(f"File path: {file_path}")
@@ -695,7 +1064,8 @@ class Command(BaseCommand):
             print(f"Strict matching: {strict}")
         
         try:
-            importer = GEDCOMImporter(pretend=pretend, strict=strict, stdout=self.stdout)
+            importer = GEDCOMImporter(pretend=pretend, strict=strict, stdout=self.stdout, batch_size=batch_size,
+                                      verbose=verbose)
             importer.import_gedcom(file_path)
         except Exception as e:
             raise CommandError(f"Import failed: {e}") 
\ No newline at end of file
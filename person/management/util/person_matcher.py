@@ -1,29 +1,203 @@
 import re
+import sys
 from datetime import date
-from typing import List, Optional, Tuple
-from person.models import Person
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from django.db.models import QuerySet, prefetch_related_objects
+from django.db.models.functions import Upper
+from person.models import BirthEvent, Person, PersonName, StripWhitespace
+
+
+# GEDCOM date formats, tried in this order: DD MMM YYYY, YYYY, MM/DD/YYYY
+_DAY_MONTH_YEAR_RE = re.compile(r'(\d{1,2})\s+(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)\s+(\d{4})')
+_YEAR_RE = re.compile(r'(\d{4})')
+_MONTH_DAY_YEAR_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_MONTHS = {
+    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
+}
+
+# Only the most common, widely recognized nicknames
+COMMON_NICKNAMES = {
+    'william': ['bill', 'billy'],
+    'robert': ['bob', 'bobby'],
+    'richard': ['dick', 'rick'],
+    'james': ['jim', 'jimmy'],
+    'joseph': ['joe', 'joey'],
+    'michael': ['mike', 'mikey'],
+    'christopher': ['chris'],
+    'daniel': ['dan', 'danny'],
+    'matthew': ['matt'],
+    'andrew': ['andy'],
+    'jonathan': ['jon'],
+    'benjamin': ['ben', 'benny'],
+    'nicholas': ['nick'],
+    'alexander': ['alex'],
+    'elizabeth': ['liz', 'beth'],
+    'margaret': ['maggie'],
+    'patricia': ['pat'],
+    'jennifer': ['jen'],
+    'stephanie': ['steph'],
+    'catherine': ['cathy'],
+    'peter': ['pete'],
+    'christina': ['tina']
+}
+
+# Both orders of every (full name, nickname) pair, so a check is one lookup
+_NICKNAME_PAIRS = frozenset(
+    pair
+    for full_name, nicknames in COMMON_NICKNAMES.items()
+    for nickname in nicknames
+    for pair in ((full_name, nickname), (nickname, full_name))
+)
+
+
+class MatchCandidate(NamedTuple):
+    """One name of a person that can be matched against, with their birth date"""
+    person: Person
+    first_name: str
+    middle_name: str
+    last_name: str
+    birth_date: Optional[date]
+
+
+class PersonIndex:
+    """Match candidates bucketed by normalized surname, then birth year.
+    
+    Last names must match exactly and birth years may differ by at most
+    YEAR_WINDOW, so a lookup only scans the few buckets that can hold a
+    match. Candidates without a birth date are kept under the year None.
+    """
+    YEAR_WINDOW = 2  # widest _dates_match tolerance (non-strict)
+    
+    def __init__(self):
+        # Entries carry the candidate's normalized first name so it isn't
+        # lowercased again on every comparison
+        self._buckets: Dict[str, Dict[Optional[int], List[Tuple[str, MatchCandidate]]]] = {}
+    
+    @classmethod
+    def from_database(cls, chunk_size: int = 2000) -> 'PersonIndex':
+        """Index every name of every person in the database.
+        
+        Rows are streamed with values_list rather than loaded as models with
+        prefetched relations. Each person becomes a Person holding only its
+        id and gender, shared by all of that person's candidates.
+        """
+        births: Dict[int, Optional[date]] = {}
+        for person_id, birth_date in BirthEvent.objects.order_by('pk').values_list(
+            'person_id', 'date'
+        ).iterator(chunk_size=chunk_size):
+            births.setdefault(person_id, birth_date)
+        
+        index = cls()
+        people: Dict[int, Person] = {}
+        for person_id, gender, first_name, middle_name, last_name in PersonName.objects.order_by(
+            'person_id', 'pk'
+        ).values_list(
+            'person_id', 'person__gender', 'name__first_name', 'name__middle_name', 'name__last_name'
+        ).iterator(chunk_size=chunk_size):
+            person = people.get(person_id)
+            if person is None:
+                person = people[person_id] = Person(id=person_id, gender=gender)
+            index.add(MatchCandidate(
+                person, first_name, middle_name, last_name, births.get(person_id)
+            ))
+        return index
+    
+    def add(self, candidate: MatchCandidate):
+        key = PersonMatcher.normalize(candidate.last_name)
+        first_key = PersonMatcher.normalize(candidate.first_name)
+        # _names_match never matches a missing first or last name
+        if not key or not first_key:
+            return
+        year = candidate.birth_date.year if candidate.birth_date else None
+        self._buckets.setdefault(key, {}).setdefault(year, []).append((first_key, candidate))
+    
+    def remove(self, candidate: MatchCandidate):
+        """Remove a candidate added earlier, e.g. one whose person wasn't saved"""
+        year = candidate.birth_date.year if candidate.birth_date else None
+        bucket = self._buckets.get(PersonMatcher.normalize(candidate.last_name), {}).get(year)
+        if bucket:
+            bucket[:] = [entry for entry in bucket if entry[1] is not candidate]
+    
+    def find(self, first_name: str, middle_name: str, last_name: str,
+             birth_date: Optional[date], strict: bool = True) -> Optional[MatchCandidate]:
+        """Find a candidate using the same rules as find_matching_person"""
+        years = self._buckets.get(PersonMatcher.normalize(last_name))
+        first_key = PersonMatcher.normalize(first_name)
+        if not years or not first_key:
+            return None
+        
+        if birth_date:
+            window = 0 if strict else self.YEAR_WINDOW
+            # Closest years first, then people with no recorded birth
+            keys = [birth_date.year]
+            for offset in range(1, window + 1):
+                keys += [birth_date.year - offset, birth_date.year + offset]
+            keys.append(None)
+            buckets = [years[key] for key in keys if key in years]
+        else:
+            buckets = years.values()
+        
+        # Every candidate in these buckets already has the same surname
+        for bucket in buckets:
+            for candidate_first, candidate in bucket:
+                if candidate_first != first_key:
+                    if strict or not PersonMatcher._is_nickname(first_key, candidate_first):
+                        continue
+                if birth_date and candidate.birth_date:
+                    if not PersonMatcher._dates_match(birth_date, candidate.birth_date, strict):
+                        continue
+                return candidate
+        return None
 
 
 class PersonMatcher:
     """Simple matching for finding existing people in the database"""
     
     @staticmethod
-    def find_matching_person(gedcom_person: dict, existing_people: List[Person], strict: bool = True) -> Optional[Person]:
-        """Find a matching person using simple, predictable logic"""
-        if not existing_people:
-            return None
-            
+    def find_matching_person(gedcom_person: dict, existing_people: Optional[List[Person]] = None,
+                             strict: bool = True) -> Optional[Person]:
+        """Find a matching person using simple, predictable logic.
+        
+        Without existing_people, everyone in the database is considered.
+        """
         # Parse GEDCOM data
         name_info = gedcom_person.get('NAME', '')
         if not isinstance(name_info, str):
             name_info = ''
         first_name, middle_name, last_name = PersonMatcher._parse_name(name_info)
+        # Normalized once here instead of once per existing person
+        first_name, last_name = PersonMatcher.normalize(first_name), PersonMatcher.normalize(last_name)
+        if not first_name or not last_name:
+            return None  # _names_match never matches a missing first or last name
         
         birth_date = None
         birt = gedcom_person.get('BIRT')
         if isinstance(birt, dict):
             birth_date = PersonMatcher._parse_date(birt.get('DATE', ''))
         
+        if existing_people is None:
+            existing_people = Person.objects.all()
+        
+        # _is_match reads every person's names and birth; load them in two
+        # queries up front instead of two per person
+        if isinstance(existing_people, QuerySet):
+            # Only people with this surname can match, so let the database
+            # drop the rest, stripping and folding case like normalize does.
+            # SQLite only folds the case of ASCII letters, so other surnames
+            # are left to _names_match.
+            if last_name.isascii() and not existing_people.query.is_sliced:
+                existing_people = existing_people.filter(pk__in=PersonName.objects.alias(
+                    surname=Upper(StripWhitespace('name__last_name'))
+                ).filter(surname=last_name.upper()).values('person_id'))
+            existing_people = existing_people.prefetch_related('names', 'birthevents')
+        elif existing_people:
+            prefetch_related_objects(existing_people, 'names', 'birthevents')
+        
+        if not existing_people:
+            return None
+        
         # Simple matching logic
         for person in existing_people:
             if PersonMatcher._is_match(person, first_name, middle_name, last_name, birth_date, strict):
@@ -31,21 +205,38 @@ class PersonMatcher:
         
         return None
     
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Normalize a name the same way _names_match compares them.
+        
+        Interned, since the same names recur across thousands of people.
+        """
+        return sys.intern(name.lower().strip())
+    
     @staticmethod
     def _is_match(person: Person, first_name: str, middle_name: str, last_name: str, 
                   birth_date: Optional[date], strict: bool) -> bool:
-        """Simple boolean match check - much easier to debug than scoring"""
+        """Simple boolean match check - much easier to debug than scoring.
+        
+        first_name and last_name must already be normalized.
+        """
         
         # Check names against all person names
         for person_name in person.names.all():
-            if PersonMatcher._names_match(
-                first_name, middle_name, last_name,
-                person_name.first_name, person_name.middle_name, person_name.last_name,
+            # Most names differ by surname, so check that before the first name
+            person_last_name = PersonMatcher.normalize(person_name.last_name)
+            if person_last_name != last_name:
+                continue
+            if PersonMatcher._normalized_names_match(
+                first_name, last_name,
+                PersonMatcher.normalize(person_name.first_name), person_last_name,
                 strict
             ):
-                # If names match, check birth date if available
-                if birth_date and person.birth and person.birth.date:
-                    if not PersonMatcher._dates_match(birth_date, person.birth.date, strict):
+                # If names match, check birth date if available.
+                # Read births via .all() so a prefetched cache is used.
+                birth = next(iter(person.birthevents.all()), None) if birth_date else None
+                if birth and birth.date:
+                    if not PersonMatcher._dates_match(birth_date, birth.date, strict):
                         continue  # Names match but dates don't - skip this person
                 
                 return True  # Found a match!
@@ -56,11 +247,17 @@ class PersonMatcher:
     def _names_match(first1: str, middle1: str, last1: str,
                     first2: str, middle2: str, last2: str, strict: bool) -> bool:
         """Simple name matching logic"""
-        
-        # Normalize names
-        first1, first2 = first1.lower().strip(), first2.lower().strip()
+        # Surnames first: when they differ, the first names are never normalized
         last1, last2 = last1.lower().strip(), last2.lower().strip()
-        
+        if not last1 or last1 != last2:
+            return False
+        return PersonMatcher._normalized_names_match(
+            first1.lower().strip(), last1, first2.lower().strip(), last2, strict
+        )
+    
+    @staticmethod
+    def _normalized_names_match(first1: str, last1: str, first2: str, last2: str, strict: bool) -> bool:
+        """_names_match for names that are already normalized"""
         # Must have first and last names
         if not first1 or not first2 or not last1 or not last2:
             return False
@@ -84,40 +281,7 @@ class PersonMatcher:
     @staticmethod
     def _is_nickname(name1: str, name2: str) -> bool:
         """Check if two names are common nicknames of each other"""
-        # Only the most common, widely recognized nicknames
-        common_nicknames = {
-            'william': ['bill', 'billy'],
-            'robert': ['bob', 'bobby'],
-            'richard': ['dick', 'rick'],
-            'james': ['jim', 'jimmy'],
-            'joseph': ['joe', 'joey'],
-            'michael': ['mike', 'mikey'],
-            'christopher': ['chris'],
-            'daniel': ['dan', 'danny'],
-            'matthew': ['matt'],
-            'andrew': ['andy'],
-            'jonathan': ['jon'],
-            'benjamin': ['ben', 'benny'],
-            'nicholas': ['nick'],
-            'alexander': ['alex'],
-            'elizabeth': ['liz', 'beth'],
-            'margaret': ['maggie'],
-            'patricia': ['pat'],
-            'jennifer': ['jen'],
-            'stephanie': ['steph'],
-            'catherine': ['cathy'],
-            'peter': ['pete'],
-            'christina': ['tina']
-        }
-        
-        # Check if either name is a known nickname for the other
-        for full_name, nicknames in common_nicknames.items():
-            if name1 == full_name and name2 in nicknames:
-                return True
-            if name2 == full_name and name1 in nicknames:
-                return True
-        
-        return False
+        return (name1, name2) in _NICKNAME_PAIRS
     
     @staticmethod
     def _dates_match(date1: date, date2: date, strict: bool) -> bool:
@@ -136,13 +300,20 @@ class PersonMatcher:
             return year_diff <= 2
     
     @staticmethod
+    @lru_cache(maxsize=8192)
     def _parse_name(name_str: str) -> Tuple[str, str, str]:
         """Parse GEDCOM name format: Given /Surname/ or Given Surname"""
         if not isinstance(name_str, str) or not name_str:
             return "", "", ""
         # Handle /Surname/ format (e.g., "John /Smith/" or "John Michael /Smith/")
         if '/' in name_str:
-            # Split by '/' and remove empty parts
+            # Common case: the given names, then the surname up to the next /
+            given_part, _, rest = name_str.partition('/')
+            surname = rest.partition('/')[0].strip()
+            given_names = given_part.split()
+            if given_names and surname:
+                return given_names[0], " ".join(given_names[1:]), surname
+            # Otherwise split by '/' and remove empty parts
             parts = [part.strip() for part in name_str.split('/') if part.strip()]
             if len(parts) >= 2:
                 # Everything before the first / is the given name
@@ -165,35 +336,29 @@ class PersonMatcher:
             return parts[0], " ".join(parts[1:-1]), parts[-1]
     
     @staticmethod
+    @lru_cache(maxsize=8192)
     def _parse_date(date_str: str) -> Optional[date]:
-        """Parse GEDCOM date format"""
+        """Parse GEDCOM date format.
+        
+        Cached: the same date strings recur across thousands of events.
+        """
         if not date_str:
             return None
+        # A bare year is the most common form and needs no pattern
+        if len(date_str) == 4 and date_str.isdecimal():
+            return date(int(date_str), 1, 1)
             
-        # Common GEDCOM date formats
-        date_patterns = [
-            r'(\d{1,2})\s+(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)\s+(\d{4})',
-            r'(\d{4})',
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',
-        ]
-        
-        month_map = {
-            'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-            'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-        }
-        
-        for pattern in date_patterns:
-            match = re.match(pattern, date_str.upper())
-            if match:
-                if len(match.groups()) == 3:
-                    if pattern == date_patterns[0]:  # DD MMM YYYY
-                        day, month, year = match.groups()
-                        return date(int(year), month_map[month], int(day))
-                    else:  # MM/DD/YYYY
-                        month, day, year = match.groups()
-                        return date(int(year), int(month), int(day))
-                elif len(match.groups()) == 1:  # YYYY
-                    year = int(match.group(1))
-                    return date(year, 1, 1)  # Use January 1st as default
+        date_str = date_str.upper()
+        match = _DAY_MONTH_YEAR_RE.match(date_str)
+        if match:
+            day, month, year = match.groups()
+            return date(int(year), _MONTHS[month], int(day))
+        match = _YEAR_RE.match(date_str)
+        if match:
+            return date(int(match.group(1)), 1, 1)  # Use January 1st as default
+        match = _MONTH_DAY_YEAR_RE.match(date_str)
+        if match:
+            month, day, year = match.groups()
+            return date(int(year), int(month), int(day))
         
         return None 
\ No newline at end of file
@@ -1,9 +1,18 @@
+import sys
 from datetime import date
 from django.test import TestCase
 from person.models import (
-    Person, Name, PersonName, BirthEvent
+    Person, Name, PersonName, BirthEvent, WHITESPACE
 )
-from person.management.util.person_matcher import PersonMatcher
+from person.management.util.person_matcher import MatchCandidate, PersonIndex, PersonMatcher
+
+
+_GEDCOM_MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+
+def _gedcom_date(value: date) -> str:
+    """Format a date as GEDCOM DD MMM YYYY, independent of the locale"""
+    return f"{value.day:02d} {_GEDCOM_MONTHS[value.month - 1]} {value.year}"
 
 
 class PersonMatcherTestCase(TestCase):
@@ -56,6 +65,43 @@ class PersonMatcherTestCase(TestCase):
         
         self.assertEqual(match, self.person1)
     
+    def test_find_matching_person_prefetches(self):
+        """Test that names and births are loaded up front, not per person"""
+        gedcom_person = {
+            'NAME': 'Mary /Johnson/',
+            'BIRT': {'DATE': '22 AUG 1985'}
+        }
+        
+        existing_people = list(Person.objects.all())
+        with self.assertNumQueries(2):
+            match = PersonMatcher.find_matching_person(gedcom_person, existing_people)
+        self.assertEqual(match, self.person2)
+        
+        with self.assertNumQueries(3):
+            match = PersonMatcher.find_matching_person(gedcom_person, Person.objects.all())
+        self.assertEqual(match, self.person2)
+    
+    def test_find_matching_person_queryset_filters_surname(self):
+        """Test that a queryset is narrowed to the surname without changing the match"""
+        gedcom_person = {'NAME': 'JOHN /SMITH/'}
+        
+        self.assertEqual(PersonMatcher.find_matching_person(gedcom_person, Person.objects.all()), self.person1)
+        self.assertIsNone(PersonMatcher.find_matching_person(
+            gedcom_person, Person.objects.exclude(pk=self.person1.pk)
+        ))
+        
+        # Stored surnames are stripped of any whitespace before they are compared
+        for padded in (' Smith ', 'Smith\t', '\nSmith\r\n', '\u3000Smith'):
+            self.name1.last_name = padded
+            self.name1.save()
+            self.assertEqual(PersonMatcher.find_matching_person(gedcom_person, Person.objects.all()), self.person1)
+        # ...using the same characters normalize strips
+        self.assertEqual(WHITESPACE, ''.join(c for c in map(chr, range(sys.maxunicode + 1)) if c.isspace()))
+        
+        # Without candidates, the whole database is searched the same way
+        with self.assertNumQueries(3):
+            self.assertEqual(PersonMatcher.find_matching_person(gedcom_person), self.person1)
+    
     def test_find_matching_person_no_match(self):
         """Test when no match is found"""
         gedcom_person = {
@@ -126,25 +172,23 @@ class PersonMatcherTestCase(TestCase):
             ('Mary', 'Sarah', False, 'Completely different names Mary and Sarah should not match'),
         ]
         
-        for existing_first, gedcom_first, should_match, description in test_cases:
+        # Create a test person with the existing name for every case at once
+        test_people = Person.objects.bulk_create([Person() for _ in test_cases])
+        test_names = Name.objects.bulk_create([
+            Name(first_name=existing_first, last_name='Test')
+            for existing_first, _, _, _ in test_cases
+        ])
+        PersonName.objects.bulk_create([
+            PersonName(person=test_person, name=test_name, name_type=PersonName.Type.BIRTH)
+            for test_person, test_name in zip(test_people, test_names)
+        ])
+        BirthEvent.objects.bulk_create([
+            BirthEvent(person=test_person, date=date(1980, 1, 1), location='Test Location')
+            for test_person in test_people
+        ])
+        
+        for test_person, (existing_first, gedcom_first, should_match, description) in zip(test_people, test_cases):
             with self.subTest(description):
-                # Create a test person with the existing name
-                test_person = Person.objects.create()
-                test_name = Name.objects.create(
-                    first_name=existing_first,
-                    last_name='Test'
-                )
-                PersonName.objects.create(
-                    person=test_person,
-                    name=test_name,
-                    name_type=PersonName.Type.BIRTH
-                )
-                BirthEvent.objects.create(
-                    person=test_person,
-                    date=date(1980, 1, 1),
-                    location='Test Location'
-                )
-                
                 # Test matching
                 gedcom_data = {
                     'NAME': f'{gedcom_first} /Test/',
@@ -192,7 +236,7 @@ class PersonMatcherTestCase(TestCase):
             with self.subTest(description):
                 gedcom_data = {
                     'NAME': 'John /Smith/',
-                    'BIRT': {'DATE': birth_date.strftime('%d %b %Y').upper()}
+                    'BIRT': {'DATE': _gedcom_date(birth_date)}
                 }
                 
                 existing_people = [test_person]
@@ -215,7 +259,7 @@ class PersonMatcherTestCase(TestCase):
             with self.subTest(f"Lenient: {description}"):
                 gedcom_data = {
                     'NAME': 'John /Smith/',
-                    'BIRT': {'DATE': birth_date.strftime('%d %b %Y').upper()}
+                    'BIRT': {'DATE': _gedcom_date(birth_date)}
                 }
                 
                 existing_people = [test_person]
@@ -227,6 +271,30 @@ class PersonMatcherTestCase(TestCase):
                 else:
                     self.assertIsNone(match, f"Should not match: {description}")
     
+    def test_person_index(self):
+        """Test that the index only returns candidates with a compatible surname and birth year"""
+        index = PersonIndex.from_database()
+        
+        match = index.find('John', '', ' SMITH ', date(1980, 3, 15))
+        self.assertEqual(match.person, self.person1)
+        self.assertEqual(match.birth_date, date(1980, 3, 15))
+        self.assertEqual(index.find('Mary', '', 'Johnson', None).person, self.person2)
+        
+        # Birth years outside the window aren't matched
+        self.assertIsNone(index.find('John', '', 'Smith', date(1981, 3, 15)))
+        self.assertEqual(index.find('John', '', 'Smith', date(1981, 3, 15), strict=False).person, self.person1)
+        self.assertIsNone(index.find('John', '', 'Smith', date(1983, 3, 15), strict=False))
+        
+        # Added candidates are found, including ones with no birth date
+        other = Person.objects.create()
+        candidate = MatchCandidate(other, 'Jane', '', 'Doe', None)
+        index.add(candidate)
+        self.assertEqual(index.find('Jane', '', 'Doe', date(1950, 1, 1)).person, other)
+        
+        # ...and can be removed again
+        index.remove(candidate)
+        self.assertIsNone(index.find('Jane', '', 'Doe', None))
+    
     def test_nickname_detection(self):
         """Test the simplified nickname detection"""
         # Test common nicknames
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 04:19
+
+import django.db.models.functions.text
+import person.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0010_alter_personname_name_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='name',
+            index=models.Index(django.db.models.functions.text.Upper(person.models.StripWhitespace('last_name')), name='name_upper_trim_last_name_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.exceptions import ValidationError
 import os
 import posixpath
@@ -17,17 +18,24 @@ class Person(models.Model):
     gender = models.CharField(max_length=1, choices=Gender, default=Gender.UNKNOWN)
     is_living = models.BooleanField(default=True)
 
+    def _first_related(self, relation):
+        """First related row by pk, read from prefetched rows when available"""
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if relation in prefetched:
+            return min(prefetched[relation], key=lambda obj: obj.pk, default=None)
+        return getattr(self, relation).first()
+
     @property
     def name(self):
-        return self.names.first()
+        return self._first_related('names')
     
     @property
     def birth(self):
-        return self.birthevents.first()
+        return self._first_related('birthevents')
     
     @property
     def death(self):
-        return self.deathevents.first()
+        return self._first_related('deathevents')
 
     @property
     def siblings(self):
@@ -143,12 +151,32 @@ class PersonAttachment(models.Model):
         ordering = ['-uploaded_at']
 
 
+# Every character str.strip() removes, not just the spaces SQL's TRIM does
+WHITESPACE = '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000'
+
+class StripWhitespace(models.Func):
+    """Trims the WHITESPACE characters from both ends, like str.strip()"""
+    # The characters are written into the SQL rather than passed as a
+    # parameter, so queries match the index built on this expression
+    template = f"TRIM(%(expressions)s, '{WHITESPACE}')"
+    arity = 1
+    output_field = models.CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template=f"BTRIM(%(expressions)s, '{WHITESPACE}')", **extra_context)
+
 # Names
 class Name(models.Model):
     first_name = models.CharField(max_length=100)
     middle_name = models.CharField(max_length=100, blank=True)
     last_name = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            # Serves PersonMatcher's case- and whitespace-insensitive surname filter
+            models.Index(Upper(StripWhitespace('last_name')), name='name_upper_trim_last_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name}{f' {self.middle_name}' if self.middle_name else ''} {self.last_name}"
 
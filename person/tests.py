@@ -4,13 +4,17 @@ from __future__ import annotations
 
 import shutil
 import tempfile
+from io import StringIO
 from pathlib import Path
 
 from django.conf import settings
-from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.text import slugify
 
+from person.management.commands.migrate_attachment_folders import _slugify
 from person.models import Name, Person, PersonAttachment
-from person.utils import detect_file_type, sync_person_attachments
+from person.utils import detect_file_type, sync_all_persons, sync_person_attachments
 
 
 class PersonAttachmentFolderTests(TestCase):
@@ -33,6 +37,12 @@ class PersonAttachmentFolderTests(TestCase):
         expected = f'people/Smith_John_{self.person.pk}'
         self.assertEqual(self.person.get_attachment_folder_path(), expected)
 
+    def test_folder_path_uses_prefetched_names(self):
+        person = Person.objects.prefetch_related('names').get(pk=self.person.pk)
+        with self.assertNumQueries(0):
+            path = person.get_attachment_folder_path()
+        self.assertEqual(path, f'people/Smith_John_{self.person.pk}')
+
     def test_folder_path_no_name(self):
         person = Person.objects.create(gender='U')
         expected = f'people/Unknown_Person_{person.pk}'
@@ -61,6 +71,21 @@ class PersonAttachmentFolderTests(TestCase):
             ).exists()
         )
 
+    def test_sync_all_persons(self):
+        folder_path = self._person_folder()
+        folder_path.mkdir(parents=True, exist_ok=True)
+        (folder_path / 'test.pdf').write_text('test content')
+        (folder_path / '.DS_Store').write_text('')
+        other = Person.objects.create(gender='F')
+
+        stats = sync_all_persons()
+
+        self.assertEqual(stats['persons_synced'], 2)
+        self.assertEqual(stats['total_files_created'], 1)
+        self.assertEqual(stats['errors'], [])
+        self.assertTrue(PersonAttachment.objects.filter(person=self.person, original_filename='test.pdf').exists())
+        self.assertFalse(PersonAttachment.objects.filter(person=other).exists())
+
     def test_sync_ignores_existing_attachments(self):
         folder_path = self._person_folder()
         folder_path.mkdir(parents=True, exist_ok=True)
@@ -103,3 +128,43 @@ class PersonAttachmentFolderTests(TestCase):
                 file_type='photo',
             ).exists()
         )
+
+    def test_migrate_legacy_folder(self):
+        legacy_folder = Path(settings.MEDIA_ROOT) / 'person_attachments' / 'smith_john'
+        legacy_folder.mkdir(parents=True)
+        (legacy_folder / 'letter.pdf').write_text('letter')
+
+        attachment = PersonAttachment.objects.create(
+            person=self.person,
+            file='person_attachments/smith_john/letter.pdf',
+            original_filename='letter.pdf',
+        )
+        # save() moves new files under the person's folder; store the legacy path directly
+        PersonAttachment.objects.filter(pk=attachment.pk).update(file='person_attachments/smith_john/letter.pdf')
+
+        call_command('migrate_attachment_folders', stdout=StringIO())
+
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.file.name, f'people/Smith_John_{self.person.pk}/letter.pdf')
+        self.assertTrue((self._person_folder() / 'letter.pdf').is_file())
+        self.assertFalse((legacy_folder / 'letter.pdf').exists())
+
+    def test_migrate_legacy_folder_with_many_files(self):
+        # Enough files that they are moved on the thread pool
+        legacy_folder = Path(settings.MEDIA_ROOT) / 'person_attachments' / 'smith_john'
+        names = [f'scans/page{i}.jpg' for i in range(10)] + ['letter.pdf']
+        for name in names:
+            (legacy_folder / name).parent.mkdir(parents=True, exist_ok=True)
+            (legacy_folder / name).write_text(name)
+
+        call_command('migrate_attachment_folders', stdout=StringIO())
+
+        for name in names:
+            self.assertEqual((self._person_folder() / name).read_text(), name)
+        self.assertEqual(list(legacy_folder.rglob('*.*')), [])
+
+
+class SlugifyTests(SimpleTestCase):
+    def test_matches_django_slugify(self):
+        for value in ["smith_john_1980", "o'brien_mary", " van der berg-_anna ", "müller_jörg", "__x--y__"]:
+            self.assertEqual(_slugify(value), slugify(value), value)
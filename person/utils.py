@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, Iterable
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
 from django.conf import settings
 from django.utils import timezone
@@ -15,6 +18,9 @@ if TYPE_CHECKING:  # pragma: no cover - typing only
 
 SKIP_PATTERNS = {".DS_Store", "Thumbs.db", ".gitkeep", ".gitignore"}
 
+# Folder scans are IO-bound, so sync_all_persons runs them on threads
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 FILE_TYPE_MAP = {
     "photo": [".jpg", ".jpeg", ".png", ".gif", ".tiff", ".bmp", ".webp", ".heic", ".heif"],
     "document": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt", ".pages"],
@@ -46,8 +52,17 @@ def _gather_files(path: Path, recursive: bool) -> Iterable[Path]:
         yield from path.glob("*")
 
 
-def sync_person_attachments(person: "Person", recursive: bool = True, dry_run: bool = False) -> Dict[str, object]:
-    """Synchronise files on disk with ``PersonAttachment`` records."""
+def _list_files(path: Path, recursive: bool) -> List[Path]:
+    return [file_path for file_path in _gather_files(path, recursive=recursive) if file_path.is_file()]
+
+
+def sync_person_attachments(
+    person: "Person", recursive: bool = True, dry_run: bool = False, files: Optional[List[Path]] = None
+) -> Dict[str, object]:
+    """Synchronise files on disk with ``PersonAttachment`` records.
+
+    ``files`` may hold the folder's files when they were already listed.
+    """
 
     folder_path = person.get_attachment_folder_path()
     media_root = Path(settings.MEDIA_ROOT)
@@ -66,10 +81,10 @@ def sync_person_attachments(person: "Person", recursive: bool = True, dry_run: b
         "dry_run": dry_run,
     }
 
-    for file_path in _gather_files(full_path, recursive=recursive):
-        if not file_path.is_file():
-            continue
+    if files is None:
+        files = _list_files(full_path, recursive=recursive)
 
+    for file_path in files:
         if should_skip_file(file_path.name):
             stats["files_skipped"] += 1
             continue
@@ -132,26 +147,38 @@ def sync_all_persons(verbose: bool = False, dry_run: bool = False) -> Dict[str,
         "errors": [],
     }
 
-    for person in Person.objects.all():
-        try:
-            stats = sync_person_attachments(person, recursive=True, dry_run=dry_run)
-            total_stats["persons_synced"] += 1
-            total_stats["total_files_created"] += stats["files_created"] if not dry_run else 0
-            total_stats["total_files_existing"] += stats["files_existing"]
-            total_stats["pending_files"] += len(stats.get("pending_files", []))
-
-            if verbose and (stats["files_created"] or stats.get("pending_files")):
-                created = stats["files_created"]
-                if dry_run:
-                    self_report = f"would create {len(stats['pending_files'])} file(s)"
-                else:
-                    self_report = f"created {created} file(s)"
-                print(f"✓ {person.name} (ID: {person.pk}): {self_report}")
-
-        except Exception as exc:  # pragma: no cover - defensive logging
-            message = f"Error syncing {person} (ID: {person.pk}): {exc}"
-            total_stats["errors"].append(message)
-            if verbose:
-                print(f"✗ {message}")
+    # Only the id and first name are read per person (for the folder path);
+    # names are prefetched and people streamed in chunks
+    people = Person.objects.only("id").prefetch_related("names").iterator(chunk_size=500)
+    media_root = Path(settings.MEDIA_ROOT)
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        # Each chunk's folders are listed in parallel; the database work
+        # stays on this thread and its connection
+        while chunk := list(islice(people, 500)):
+            scans = [
+                executor.submit(_list_files, media_root / person.get_attachment_folder_path(), True)
+                for person in chunk
+            ]
+            for person, scan in zip(chunk, scans):
+                try:
+                    stats = sync_person_attachments(person, recursive=True, dry_run=dry_run, files=scan.result())
+                    total_stats["persons_synced"] += 1
+                    total_stats["total_files_created"] += stats["files_created"] if not dry_run else 0
+                    total_stats["total_files_existing"] += stats["files_existing"]
+                    total_stats["pending_files"] += len(stats.get("pending_files", []))
+
+                    if verbose and (stats["files_created"] or stats.get("pending_files")):
+                        created = stats["files_created"]
+                        if dry_run:
+                            self_report = f"would create {len(stats['pending_files'])} file(s)"
+                        else:
+                            self_report = f"created {created} file(s)"
+                        print(f"✓ {person.name} (ID: {person.pk}): {self_report}")
+
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    message = f"Error syncing {person} (ID: {person.pk}): {exc}"
+                    total_stats["errors"].append(message)
+                    if verbose:
+                        print(f"✗ {message}")
 
     return total_stats